@@ -5,25 +5,46 @@ Provides REST API for querying traces and steps.
 """
 
 import sys
+import time
+import asyncio
+import contextlib
+import hashlib
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 # Add parent directory to path to import decisiontrace
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from fastapi import FastAPI, HTTPException
+import orjson
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from decisiontrace import SQLiteStorage
-from decisiontrace.models import Trace
 
-# Initialize storage
-storage = SQLiteStorage()
+# Opened on startup so importing this module (reloader, tests) doesn't open the database
+storage: Optional[SQLiteStorage] = None
+
+# Interval between WAL checkpoints run by the background task
+WAL_CHECKPOINT_INTERVAL_S = 60.0
+_checkpoint_task: Optional[asyncio.Task] = None
+
+# Short-lived cache of serialized /api/traces bodies for polling clients.
+# Entries are keyed by query params and also invalidated when the
+# storage data version changes.
+TRACE_LIST_CACHE_TTL_S = 5.0
+TRACE_LIST_CACHE_MAX_ENTRIES = 128
+# (limit, status, before_id) -> (cached_at, data_version, body, etag)
+_trace_list_cache: dict[tuple, tuple[float, Any, bytes, str]] = {}
+# Handlers run in the threadpool; guards updates to the cache
+_trace_list_cache_lock = threading.Lock()
 
 # Create FastAPI app
 app = FastAPI(
     title="DecisionTrace X-Ray API",
     description="API for debugging multi-step decision processes",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # orjson for faster response encoding
 )
 
 # CORS middleware for local development
@@ -42,26 +63,75 @@ async def health_check():
     return {"status": "ok", "service": "DecisionTrace X-Ray API"}
 
 
-@app.get("/api/traces", response_model=list[Trace])
-async def list_traces(
+@app.get("/api/traces")
+def list_traces(
     limit: int = 100,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    before_id: Optional[str] = None,
+    if_none_match: Optional[str] = Header(default=None)
 ):
     """
-    List all traces with optional filtering.
+    List trace summaries (without steps) with optional filtering.
+
+    Responses are cached briefly and carry an ETag; a matching
+    If-None-Match header gets a 304.
 
     - **limit**: Maximum number of traces to return (default 100)
     - **status**: Filter by status (running, completed, failed)
+    - **before_id**: Return traces created before this trace ID (pagination cursor)
     """
+    key = (limit, status, before_id)
+    cached = _trace_list_cache.get(key)
+
     try:
-        traces = storage.get_all_traces(limit=limit, status=status)
-        return traces
+        version = storage.data_version
+        if cached and cached[1] == version and time.monotonic() - cached[0] < TRACE_LIST_CACHE_TTL_S:
+            body, etag = cached[2], cached[3]
+        else:
+            # Raw dicts straight from storage, encoded in one pass without models
+            body = orjson.dumps(list(storage.iter_trace_dicts(
+                limit=limit,
+                status=status,
+                before_id=before_id
+            )))
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+            with _trace_list_cache_lock:
+                _trace_list_cache.pop(key, None)
+                if len(_trace_list_cache) >= TRACE_LIST_CACHE_MAX_ENTRIES:
+                    _trace_list_cache.pop(next(iter(_trace_list_cache)))
+                _trace_list_cache[key] = (time.monotonic(), version, body, etag)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        if cached is None:
+            raise HTTPException(status_code=500, detail=str(e))
+        # Serve the last good response rather than failing the poll
+        body, etag = cached[2], cached[3]
+
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+@app.get("/api/traces/stream")
+def stream_traces(
+    limit: int = 100,
+    status: Optional[str] = None,
+    before_id: Optional[str] = None
+):
+    """
+    Stream trace summaries as newline-delimited JSON, one trace per line.
+
+    Accepts the same parameters as `/api/traces`.
+    """
+    def generate():
+        for trace in storage.iter_traces(limit=limit, status=status, before_id=before_id):
+            yield orjson.dumps(trace.model_dump(mode="json")) + b"\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 
-@app.get("/api/traces/{trace_id}", response_model=Trace)
-async def get_trace(trace_id: str):
+@app.get("/api/traces/{trace_id}")
+def get_trace(trace_id: str):
     """
     Get a specific trace by ID with all its steps.
     """
@@ -69,17 +139,41 @@ async def get_trace(trace_id: str):
         trace = storage.get_trace(trace_id)
         if trace is None:
             raise HTTPException(status_code=404, detail="Trace not found")
-        return trace
+        return ORJSONResponse(trace.model_dump(mode="json"))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _checkpoint_periodically() -> None:
+    """Truncate the WAL on an interval so it can't grow without bound."""
+    while True:
+        await asyncio.sleep(WAL_CHECKPOINT_INTERVAL_S)
+        try:
+            # Off the event loop; the checkpoint may wait on busy readers
+            await asyncio.to_thread(storage.checkpoint)
+        except Exception as e:
+            print(f"WAL checkpoint failed: {e}", file=sys.stderr)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Open storage and start the WAL checkpoint task on startup."""
+    global storage, _checkpoint_task
+    storage = SQLiteStorage()
+    _checkpoint_task = asyncio.create_task(_checkpoint_periodically())
+
+
 @app.on_event("shutdown")
-def shutdown_event():
-    """Close storage on shutdown."""
-    storage.close()
+async def shutdown_event():
+    """Stop the checkpoint task and close storage on shutdown."""
+    if _checkpoint_task is not None:
+        _checkpoint_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _checkpoint_task
+    if storage is not None:
+        storage.close()
 
 
 if __name__ == "__main__":
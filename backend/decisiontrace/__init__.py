@@ -4,9 +4,8 @@ DecisionTrace X-Ray SDK
 A lightweight SDK for capturing decision context in multi-step workflows.
 """
 
-from .xray import XRay, TraceContext, StepContext
-from .models import Trace, Step
-from .storage import StorageBackend, SQLiteStorage
+import importlib
+from typing import Any
 
 __version__ = "1.0.0"
 
@@ -19,3 +18,29 @@ __all__ = [
     "StorageBackend",
     "SQLiteStorage",
 ]
+
+# Public name -> submodule that defines it. Submodules (pydantic models,
+# sqlite storage) are imported on first attribute access (PEP 562) so a
+# bare "import decisiontrace" stays cheap.
+_LAZY_ATTRS = {
+    "XRay": ".xray",
+    "TraceContext": ".xray",
+    "StepContext": ".xray",
+    "Trace": ".models",
+    "Step": ".models",
+    "StorageBackend": ".storage",
+    "SQLiteStorage": ".storage",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -44,6 +44,7 @@ class Trace(BaseModel):
     end_time: Optional[datetime] = None
     duration_ms: Optional[int] = None
     steps: list[Step] = Field(default_factory=list)
+    step_count: Optional[int] = None  # Set by storage; steps may be omitted in listings
     metadata: dict[str, Any] = Field(default_factory=dict)  # Extensible
     status: Literal["running", "completed", "failed"] = "running"
 
@@ -20,14 +20,34 @@ class StorageBackend(ABC):
         """Save or update a step."""
         pass
 
+    def save_steps_and_trace(self, steps: list[Step], trace: Trace) -> None:
+        """Save a batch of steps and their parent trace together.
+
+        Backends that support transactions or bulk inserts should override
+        this to write all records at once.
+        """
+        for step in steps:
+            self.save_step(step)
+        self.save_trace(trace)
+
     @abstractmethod
     def get_trace(self, trace_id: str) -> Optional[Trace]:
         """Get a trace by ID with all its steps."""
         pass
 
     @abstractmethod
-    def get_all_traces(self, limit: int = 100, status: Optional[str] = None) -> list[Trace]:
-        """Get all traces with optional filtering."""
+    def get_all_traces(
+        self,
+        limit: int = 100,
+        status: Optional[str] = None,
+        include_steps: bool = False,
+        before_id: Optional[str] = None
+    ) -> list[Trace]:
+        """Get traces, newest first, with optional filtering.
+
+        Steps are only loaded when include_steps is set; summaries carry
+        step_count instead. before_id pages past the given trace.
+        """
         pass
 
     @abstractmethod
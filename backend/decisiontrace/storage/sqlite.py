@@ -3,18 +3,109 @@ SQLite storage backend for DecisionTrace X-Ray system.
 """
 
 import sqlite3
-import json
+import threading
+import weakref
 from pathlib import Path
-from typing import Optional
+from typing import Any, Iterator, Optional
 from datetime import datetime
 
+import orjson
+
 from .base import StorageBackend
 from ..models import Trace, Step
 
+# Non-str keys are coerced like the stdlib json module did
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+# Bumped whenever the on-disk schema changes; stored in PRAGMA user_version
+# 1: INTEGER epoch-ms timestamps
+# 2: composite (status, created_at) index for filtered listings
+# 3: ascending listing indexes so the rowid tiebreak is served by the index
+_SCHEMA_VERSION = 3
+
+
+def _dumps(value: Any) -> str:
+    """Serialize a value to a JSON string for a TEXT column."""
+    return orjson.dumps(value, option=_JSON_OPTIONS).decode()
+
+
+def _to_epoch_ms(value: Optional[datetime]) -> Optional[int]:
+    """Convert a datetime to integer epoch milliseconds."""
+    return int(value.timestamp() * 1000) if value else None
+
+
+def _from_epoch_ms(value: Optional[int]) -> Optional[datetime]:
+    """Convert integer epoch milliseconds back to a datetime."""
+    return datetime.fromtimestamp(value / 1000) if value is not None else None
+
+
+def _close_thread_connection(
+    connections: list[sqlite3.Connection],
+    lock: threading.Lock,
+    conn: sqlite3.Connection
+) -> None:
+    """Close a finished thread's connection unless close() already took it."""
+    with lock:
+        if conn not in connections:
+            return
+        connections.remove(conn)
+    conn.close()
+
 
 class SQLiteStorage(StorageBackend):
     """SQLite implementation of storage backend."""
 
+    # Hot-path statements are fixed strings so each connection's statement
+    # cache can hand back the already-prepared statement
+
+    # Upsert in place; INSERT OR REPLACE would delete the row first and
+    # cascade-delete the trace's steps
+    _SQL_INSERT_TRACE = """
+        INSERT INTO traces (
+            trace_id, name, start_time, end_time, duration_ms, metadata, status
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(trace_id) DO UPDATE SET
+            name = excluded.name,
+            start_time = excluded.start_time,
+            end_time = excluded.end_time,
+            duration_ms = excluded.duration_ms,
+            metadata = excluded.metadata,
+            status = excluded.status
+    """
+
+    _SQL_INSERT_STEP = """
+        INSERT INTO steps (
+            step_id, trace_id, name, input, output, reasoning, metadata,
+            start_time, end_time, duration_ms, status, error, step_order
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(step_id) DO UPDATE SET
+            name = excluded.name,
+            input = excluded.input,
+            output = excluded.output,
+            reasoning = excluded.reasoning,
+            metadata = excluded.metadata,
+            start_time = excluded.start_time,
+            end_time = excluded.end_time,
+            duration_ms = excluded.duration_ms,
+            status = excluded.status,
+            error = excluded.error,
+            step_order = excluded.step_order
+    """
+
+    _SQL_GET_TRACE = "SELECT * FROM traces WHERE trace_id = ?"
+
+    _SQL_GET_STEPS = "SELECT * FROM steps WHERE trace_id = ? ORDER BY step_order ASC"
+
+    # Only the columns a summary needs, so the planner can avoid reading
+    # anything beyond the index order and the row itself
+    _SQL_LIST_TRACES = """
+        SELECT trace_id, name, start_time, end_time, duration_ms, metadata, status, (
+            SELECT COUNT(*) FROM steps WHERE steps.trace_id = traces.trace_id
+        ) AS step_count
+        FROM traces
+    """
+
     def __init__(self, db_path: str = "./data/traces.db"):
         """Initialize SQLite storage.
 
@@ -26,24 +117,92 @@ class SQLiteStorage(StorageBackend):
         # Create data directory if it doesn't exist
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row  # Return rows as dicts
+        # One connection per thread so WAL readers and writers don't
+        # serialize on a single shared connection
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        # Dedicated connection for data_version, which is only comparable
+        # between reads on the same connection
+        self._version_conn: Optional[sqlite3.Connection] = None
+        self._version_lock = threading.Lock()
+
         self._init_db()
 
+    def _get_conn(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+            # Threadpool workers are retired when idle; close the connection
+            # with its thread instead of keeping it open until close()
+            weakref.finalize(
+                threading.current_thread(),
+                _close_thread_connection,
+                self._connections,
+                self._connections_lock,
+                conn
+            )
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and configure a new connection."""
+        # Each connection is only used by one thread at a time; cross-thread
+        # access is allowed so close() can shut them all down
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row  # Return rows as dicts
+
+        # WAL is durable at NORMAL; keep hot pages and temp tables in memory
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-64000")  # 64 MB
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA foreign_keys=ON")
+        # Per-connection setting; explicit so the WAL bound doesn't depend on build defaults
+        conn.execute("PRAGMA wal_autocheckpoint=1000")  # pages
+
+        return conn
+
     def _init_db(self) -> None:
         """Initialize database schema."""
-        cursor = self.conn.cursor()
+        conn = self._get_conn()
+        cursor = conn.cursor()
 
-        # Enable WAL mode for better concurrency
+        # Enable WAL mode for better concurrency (persists in the database file).
+        # Can't be changed inside a transaction, so it is set first.
         cursor.execute("PRAGMA journal_mode=WAL")
 
+        # Schema setup and migration run as one transaction, so a failed
+        # migration rolls back to the old tables instead of losing them
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            self._migrate(cursor)
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def _migrate(self, cursor: sqlite3.Cursor) -> None:
+        """Bring the schema up to _SCHEMA_VERSION, without committing."""
+        # Pull rows out of tables created by an older schema so they can be
+        # recreated below and re-inserted in the current format
+        legacy_rows = None
+        schema_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if schema_version < 1:
+            legacy_rows = self._drop_legacy_tables(cursor)
+
         # Create traces table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS traces (
                 trace_id TEXT PRIMARY KEY,
                 name TEXT NOT NULL,
-                start_time TEXT NOT NULL,
-                end_time TEXT,
+                start_time INTEGER NOT NULL,
+                end_time INTEGER,
                 duration_ms INTEGER,
                 metadata TEXT,
                 status TEXT CHECK(status IN ('running', 'completed', 'failed')),
@@ -51,12 +210,21 @@ class SQLiteStorage(StorageBackend):
             )
         """)
 
+        # Filtered listings seek on status and read rows already in
+        # created_at order. The indexes are ascending and scanned backward:
+        # the implicit trailing rowid then also comes out descending, so
+        # "ORDER BY created_at DESC, rowid DESC" needs no temp B-tree sort.
+        # Older schemas had a single-column status index and DESC variants.
+        if schema_version < 3:
+            cursor.execute("DROP INDEX IF EXISTS idx_traces_status")
+            cursor.execute("DROP INDEX IF EXISTS idx_traces_status_created")
+            cursor.execute("DROP INDEX IF EXISTS idx_traces_created_at")
         cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_traces_status ON traces(status)
+            CREATE INDEX IF NOT EXISTS idx_traces_status_created_at ON traces(status, created_at)
         """)
 
         cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_traces_created_at ON traces(created_at DESC)
+            CREATE INDEX IF NOT EXISTS idx_traces_created_at ON traces(created_at)
         """)
 
         # Create steps table
@@ -69,8 +237,8 @@ class SQLiteStorage(StorageBackend):
                 output TEXT,
                 reasoning TEXT,
                 metadata TEXT,
-                start_time TEXT NOT NULL,
-                end_time TEXT,
+                start_time INTEGER NOT NULL,
+                end_time INTEGER,
                 duration_ms INTEGER,
                 status TEXT CHECK(status IN ('running', 'completed', 'failed')),
                 error TEXT,
@@ -87,133 +255,354 @@ class SQLiteStorage(StorageBackend):
             CREATE INDEX IF NOT EXISTS idx_steps_order ON steps(trace_id, step_order)
         """)
 
-        self.conn.commit()
+        if legacy_rows:
+            self._restore_legacy_rows(cursor, *legacy_rows)
 
-    def save_trace(self, trace: Trace) -> None:
-        """Save or update a trace."""
-        cursor = self.conn.cursor()
+        if schema_version < _SCHEMA_VERSION:
+            # Refresh planner statistics after schema/index changes
+            cursor.execute("ANALYZE")
+            cursor.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO traces (
-                trace_id, name, start_time, end_time, duration_ms, metadata, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            trace.trace_id,
-            trace.name,
-            trace.start_time.isoformat() if trace.start_time else None,
-            trace.end_time.isoformat() if trace.end_time else None,
-            trace.duration_ms,
-            json.dumps(trace.metadata),
-            trace.status
-        ))
+    def _drop_legacy_tables(
+        self, cursor: sqlite3.Cursor
+    ) -> Optional[tuple[list[sqlite3.Row], list[sqlite3.Row]]]:
+        """Read and drop tables from a pre-versioned schema (ISO TEXT timestamps).
 
-        self.conn.commit()
+        Returns:
+            (trace_rows, step_rows), or None if there was nothing to migrate
+        """
+        tables = {
+            row["name"]
+            for row in cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+        if "traces" not in tables:
+            return None
 
-    def save_step(self, step: Step) -> None:
-        """Save or update a step."""
-        cursor = self.conn.cursor()
+        trace_rows = cursor.execute("SELECT * FROM traces").fetchall()
+        step_rows = cursor.execute("SELECT * FROM steps").fetchall() if "steps" in tables else []
+
+        cursor.execute("DROP TABLE IF EXISTS steps")
+        cursor.execute("DROP TABLE traces")
+
+        return trace_rows, step_rows
+
+    def _restore_legacy_rows(
+        self,
+        cursor: sqlite3.Cursor,
+        trace_rows: list[sqlite3.Row],
+        step_rows: list[sqlite3.Row]
+    ) -> None:
+        """Re-insert legacy rows, converting ISO timestamps to epoch ms."""
+        def convert(value: Optional[str]) -> Optional[int]:
+            return _to_epoch_ms(datetime.fromisoformat(value)) if value else None
+
+        # The legacy schema ran without foreign keys, so deleting a trace
+        # could leave its steps behind; those orphans are dropped
+        trace_ids = {row["trace_id"] for row in trace_rows}
+
+        cursor.executemany("""
+            INSERT INTO traces (
+                trace_id, name, start_time, end_time, duration_ms, metadata, status, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                row["trace_id"],
+                row["name"],
+                convert(row["start_time"]),
+                convert(row["end_time"]),
+                row["duration_ms"],
+                row["metadata"],
+                row["status"],
+                row["created_at"]
+            )
+            for row in trace_rows
+        ])
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO steps (
+        cursor.executemany("""
+            INSERT INTO steps (
                 step_id, trace_id, name, input, output, reasoning, metadata,
                 start_time, end_time, duration_ms, status, error, step_order
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            step.step_id,
-            step.trace_id,
-            step.name,
-            json.dumps(step.input),
-            json.dumps(step.output) if step.output else None,
-            step.reasoning,
-            json.dumps(step.metadata),
-            step.start_time.isoformat() if step.start_time else None,
-            step.end_time.isoformat() if step.end_time else None,
-            step.duration_ms,
-            step.status,
-            step.error,
-            step.step_order
+        """, [
+            (
+                row["step_id"],
+                row["trace_id"],
+                row["name"],
+                row["input"],
+                row["output"],
+                row["reasoning"],
+                row["metadata"],
+                convert(row["start_time"]),
+                convert(row["end_time"]),
+                row["duration_ms"],
+                row["status"],
+                row["error"],
+                row["step_order"]
+            )
+            for row in step_rows
+            if row["trace_id"] in trace_ids
+        ])
+
+    @property
+    def data_version(self) -> int:
+        """Token that changes whenever the stored data may have changed.
+
+        PRAGMA data_version changes for commits made by other connections
+        and is only meaningful per connection, so it is always read from
+        one connection that never writes. Every thread's commits, and
+        other processes', then show up in the same token.
+        """
+        with self._version_lock:
+            if self._version_conn is None:
+                self._version_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def save_trace(self, trace: Trace) -> None:
+        """Save or update a trace."""
+        conn = self._get_conn()
+        with conn:
+            self._write_trace(conn, trace)
+
+    def save_step(self, step: Step) -> None:
+        """Save or update a step."""
+        conn = self._get_conn()
+        with conn:
+            self._write_steps(conn, [step])
+
+    def save_steps_and_trace(self, steps: list[Step], trace: Trace) -> None:
+        """Save a batch of steps and their parent trace in a single transaction."""
+        conn = self._get_conn()
+        with conn:
+            # Parent row first so the steps' foreign key is satisfied
+            self._write_trace(conn, trace)
+            self._write_steps(conn, steps)
+
+    def _write_trace(self, conn: sqlite3.Connection, trace: Trace) -> None:
+        """Write a trace row without committing."""
+        conn.execute(self._SQL_INSERT_TRACE, (
+            trace.trace_id,
+            trace.name,
+            _to_epoch_ms(trace.start_time),
+            _to_epoch_ms(trace.end_time),
+            trace.duration_ms,
+            _dumps(trace.metadata),
+            trace.status
         ))
 
-        self.conn.commit()
+    def _write_steps(self, conn: sqlite3.Connection, steps: list[Step]) -> None:
+        """Write step rows with a single executemany, without committing."""
+        conn.executemany(self._SQL_INSERT_STEP, [
+            (
+                step.step_id,
+                step.trace_id,
+                step.name,
+                _dumps(step.input),
+                _dumps(step.output) if step.output else None,
+                step.reasoning,
+                _dumps(step.metadata),
+                _to_epoch_ms(step.start_time),
+                _to_epoch_ms(step.end_time),
+                step.duration_ms,
+                step.status,
+                step.error,
+                step.step_order
+            )
+            for step in steps
+        ])
 
     def get_trace(self, trace_id: str) -> Optional[Trace]:
         """Get a trace by ID with all its steps."""
-        cursor = self.conn.cursor()
-
-        # Get trace
-        cursor.execute("""
-            SELECT * FROM traces WHERE trace_id = ?
-        """, (trace_id,))
+        conn = self._get_conn()
 
-        trace_row = cursor.fetchone()
+        trace_row = conn.execute(self._SQL_GET_TRACE, (trace_id,)).fetchone()
         if not trace_row:
             return None
 
-        # Get steps for this trace
-        cursor.execute("""
-            SELECT * FROM steps WHERE trace_id = ? ORDER BY step_order ASC
-        """, (trace_id,))
-
-        step_rows = cursor.fetchall()
-
-        # Convert rows to models
-        trace = Trace(
-            trace_id=trace_row["trace_id"],
-            name=trace_row["name"],
-            start_time=datetime.fromisoformat(trace_row["start_time"]),
-            end_time=datetime.fromisoformat(trace_row["end_time"]) if trace_row["end_time"] else None,
-            duration_ms=trace_row["duration_ms"],
-            metadata=json.loads(trace_row["metadata"]) if trace_row["metadata"] else {},
-            status=trace_row["status"],
-            steps=[
-                Step(
-                    step_id=row["step_id"],
-                    trace_id=row["trace_id"],
-                    name=row["name"],
-                    input=json.loads(row["input"]) if row["input"] else {},
-                    output=json.loads(row["output"]) if row["output"] else None,
-                    reasoning=row["reasoning"],
-                    metadata=json.loads(row["metadata"]) if row["metadata"] else {},
-                    start_time=datetime.fromisoformat(row["start_time"]),
-                    end_time=datetime.fromisoformat(row["end_time"]) if row["end_time"] else None,
-                    duration_ms=row["duration_ms"],
-                    status=row["status"],
-                    error=row["error"],
-                    step_order=row["step_order"]
-                )
-                for row in step_rows
-            ]
-        )
+        step_rows = conn.execute(self._SQL_GET_STEPS, (trace_id,)).fetchall()
 
-        return trace
+        return self._row_to_trace(trace_row, [self._row_to_step(row) for row in step_rows])
 
-    def get_all_traces(self, limit: int = 100, status: Optional[str] = None) -> list[Trace]:
-        """Get all traces with optional filtering."""
-        cursor = self.conn.cursor()
+    def get_all_traces(
+        self,
+        limit: int = 100,
+        status: Optional[str] = None,
+        include_steps: bool = False,
+        before_id: Optional[str] = None
+    ) -> list[Trace]:
+        """Get all traces with optional filtering.
 
-        query = "SELECT * FROM traces"
-        params = []
+        Args:
+            limit: Maximum number of traces to return
+            status: Only return traces with this status
+            include_steps: Load each trace's steps; otherwise only
+                step_count is populated
+            before_id: Cursor - return traces created before this trace
+        """
+        conn = self._get_conn()
+        trace_rows = conn.execute(*self._list_query(limit, status, before_id)).fetchall()
+
+        if not include_steps or not trace_rows:
+            return [
+                self._row_to_trace(row, [], step_count=row["step_count"])
+                for row in trace_rows
+            ]
+
+        # Load steps for all traces in a single query instead of one per trace
+        trace_ids = [row["trace_id"] for row in trace_rows]
+        placeholders = ",".join("?" * len(trace_ids))
+        step_rows = conn.execute(f"""
+            SELECT * FROM steps WHERE trace_id IN ({placeholders})
+            ORDER BY trace_id, step_order ASC
+        """, trace_ids)
+
+        steps_by_trace: dict[str, list[Step]] = {trace_id: [] for trace_id in trace_ids}
+        for row in step_rows:
+            steps_by_trace[row["trace_id"]].append(self._row_to_step(row))
+
+        return [
+            self._row_to_trace(row, steps_by_trace[row["trace_id"]])
+            for row in trace_rows
+        ]
+
+    def iter_traces(
+        self,
+        limit: int = 100,
+        status: Optional[str] = None,
+        before_id: Optional[str] = None
+    ) -> Iterator[Trace]:
+        """Yield trace summaries (without steps) one row at a time.
+
+        Takes the same filters as get_all_traces. The iteration runs on its
+        own connection, since a streaming consumer may advance the generator
+        from different threads.
+        """
+        conn = self._connect()
+        try:
+            for row in conn.execute(*self._list_query(limit, status, before_id)):
+                yield self._row_to_trace(row, [], step_count=row["step_count"])
+        finally:
+            conn.close()
+
+    def iter_trace_dicts(
+        self,
+        limit: int = 100,
+        status: Optional[str] = None,
+        before_id: Optional[str] = None
+    ) -> Iterator[dict[str, Any]]:
+        """Yield trace summaries as plain dicts, ready for JSON encoding.
+
+        Same filters and shape as get_all_traces() summaries serialized in
+        JSON mode, but without building Pydantic models. Datetimes are left
+        for the JSON encoder.
+        """
+        conn = self._get_conn()
+        for row in conn.execute(*self._list_query(limit, status, before_id)).fetchall():
+            yield {
+                "trace_id": row["trace_id"],
+                "name": row["name"],
+                "start_time": _from_epoch_ms(row["start_time"]),
+                "end_time": _from_epoch_ms(row["end_time"]),
+                "duration_ms": row["duration_ms"],
+                "steps": [],
+                "step_count": row["step_count"],
+                "metadata": orjson.loads(row["metadata"]) if row["metadata"] else {},
+                "status": row["status"],
+            }
+
+    def _list_query(
+        self,
+        limit: int,
+        status: Optional[str],
+        before_id: Optional[str]
+    ) -> tuple[str, list[Any]]:
+        """Build the trace listing query (newest first, with step_count)."""
+        query = self._SQL_LIST_TRACES
+        conditions = []
+        params: list[Any] = []
 
         if status:
-            query += " WHERE status = ?"
+            conditions.append("status = ?")
             params.append(status)
 
-        query += " ORDER BY created_at DESC LIMIT ?"
+        if before_id:
+            # rowid breaks ties between traces created in the same second
+            conditions.append(
+                "(created_at, rowid) < (SELECT created_at, rowid FROM traces WHERE trace_id = ?)"
+            )
+            params.append(before_id)
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        query += " ORDER BY created_at DESC, rowid DESC LIMIT ?"
         params.append(limit)
 
-        cursor.execute(query, params)
-        trace_rows = cursor.fetchall()
+        return query, params
+
+    def _row_to_trace(
+        self,
+        row: sqlite3.Row,
+        steps: list[Step],
+        step_count: Optional[int] = None
+    ) -> Trace:
+        """Convert a traces row and its steps into a Trace model.
+
+        Rows were validated when written, so the model is built without
+        re-running Pydantic validation.
+        """
+        return Trace.model_construct(
+            trace_id=row["trace_id"],
+            name=row["name"],
+            start_time=_from_epoch_ms(row["start_time"]),
+            end_time=_from_epoch_ms(row["end_time"]),
+            duration_ms=row["duration_ms"],
+            metadata=orjson.loads(row["metadata"]) if row["metadata"] else {},
+            status=row["status"],
+            steps=steps,
+            step_count=len(steps) if step_count is None else step_count
+        )
+
+    def _row_to_step(self, row: sqlite3.Row) -> Step:
+        """Convert a steps row into a Step model (skips validation)."""
+        return Step.model_construct(
+            step_id=row["step_id"],
+            trace_id=row["trace_id"],
+            name=row["name"],
+            input=orjson.loads(row["input"]) if row["input"] else {},
+            output=orjson.loads(row["output"]) if row["output"] else None,
+            reasoning=row["reasoning"],
+            metadata=orjson.loads(row["metadata"]) if row["metadata"] else {},
+            start_time=_from_epoch_ms(row["start_time"]),
+            end_time=_from_epoch_ms(row["end_time"]),
+            duration_ms=row["duration_ms"],
+            status=row["status"],
+            error=row["error"],
+            step_order=row["step_order"]
+        )
 
-        # Load each trace with its steps
-        traces = []
-        for row in trace_rows:
-            trace = self.get_trace(row["trace_id"])
-            if trace:
-                traces.append(trace)
+    def checkpoint(self) -> None:
+        """Checkpoint the WAL into the database and truncate the WAL file.
 
-        return traces
+        Autocheckpoints run inline on whichever commit crosses the page
+        threshold and never shrink the file; long-running servers call this
+        periodically off the request path to keep the WAL bounded.
+        """
+        self._get_conn().execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
 
     def close(self) -> None:
-        """Close the database connection."""
-        if self.conn:
-            self.conn.close()
+        """Close the database connections opened by all threads."""
+        with self._connections_lock:
+            connections = self._connections[:]
+            self._connections.clear()
+        for conn in connections:
+            # Let SQLite refresh statistics for tables whose queries need it
+            conn.execute("PRAGMA optimize")
+            conn.close()
+        self._local = threading.local()
+
+        with self._version_lock:
+            if self._version_conn is not None:
+                self._version_conn.close()
+                self._version_conn = None
@@ -4,8 +4,9 @@ XRay SDK for capturing decision traces.
 Context manager pattern provides Pythonic API with automatic timing.
 """
 
-from datetime import datetime
-from typing import Any, Optional
+import time
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Optional
 from contextlib import contextmanager
 
 from .models import Trace, Step
@@ -20,6 +21,7 @@ class StepContext:
         self.step = step
         self.storage = storage
         self.trace = trace
+        self._t0 = 0
 
     def set_input(self, data: dict[str, Any]) -> None:
         """Set step input data."""
@@ -64,6 +66,26 @@ class StepContext:
             "reasoning": reasoning
         })
 
+    def add_evaluations(self, evaluations: Iterable[dict[str, Any]]) -> None:
+        """
+        Batch version of add_evaluation.
+        Each evaluation is a dict with add_evaluation's arguments as keys
+        ("reasoning" optional); all are appended in one call.
+        """
+        if "evaluations" not in self.step.metadata:
+            self.step.metadata["evaluations"] = []
+
+        self.step.metadata["evaluations"].extend(
+            {
+                "item_id": evaluation["item_id"],
+                "item_data": evaluation["item_data"],
+                "filters": evaluation["filters"],
+                "qualified": evaluation["qualified"],
+                "reasoning": evaluation.get("reasoning")
+            }
+            for evaluation in evaluations
+        )
+
     def add_llm_metadata(
         self,
         model: str,
@@ -82,15 +104,15 @@ class StepContext:
     def __enter__(self):
         """Start step execution."""
         self.step.status = "running"
+        # Wall clock for display; monotonic clock for the duration
         self.step.start_time = datetime.now()
+        self._t0 = time.monotonic_ns()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Complete step execution."""
-        self.step.end_time = datetime.now()
-        self.step.duration_ms = int(
-            (self.step.end_time - self.step.start_time).total_seconds() * 1000
-        )
+        self.step.duration_ms = (time.monotonic_ns() - self._t0) // 1_000_000
+        self.step.end_time = self.step.start_time + timedelta(milliseconds=self.step.duration_ms)
 
         if exc_type is not None:
             self.step.status = "failed"
@@ -99,11 +121,8 @@ class StepContext:
         else:
             self.step.status = "completed"
 
-        # Save step to storage
-        self.storage.save_step(self.step)
-
-        # Update trace
-        self.storage.save_trace(self.trace.trace)
+        # Buffer the step; the trace writes all steps in one batch on exit
+        self.trace._pending_steps.append(self.step)
 
         # Return False to propagate exception
         return False
@@ -116,6 +135,8 @@ class TraceContext:
         self.trace = trace
         self.storage = storage
         self._step_counter = 0
+        self._pending_steps: list[Step] = []
+        self._t0 = 0
 
     def step(self, name: str) -> StepContext:
         """Create a new step within this trace."""
@@ -132,24 +153,25 @@ class TraceContext:
     def __enter__(self):
         """Start trace execution."""
         self.trace.status = "running"
+        # Wall clock for display; monotonic clock for the duration
         self.trace.start_time = datetime.now()
+        self._t0 = time.monotonic_ns()
         self.storage.save_trace(self.trace)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Complete trace execution."""
-        self.trace.end_time = datetime.now()
-        self.trace.duration_ms = int(
-            (self.trace.end_time - self.trace.start_time).total_seconds() * 1000
-        )
+        self.trace.duration_ms = (time.monotonic_ns() - self._t0) // 1_000_000
+        self.trace.end_time = self.trace.start_time + timedelta(milliseconds=self.trace.duration_ms)
 
         if exc_type is not None:
             self.trace.status = "failed"
         else:
             self.trace.status = "completed"
 
-        # Save final trace state
-        self.storage.save_trace(self.trace)
+        # Save buffered steps and final trace state together
+        self.storage.save_steps_and_trace(self._pending_steps, self.trace)
+        self._pending_steps = []
 
         # Return False to propagate exception
         return False
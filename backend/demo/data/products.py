@@ -4,6 +4,47 @@ Dummy product data for competitor selection demo.
 Contains realistic product examples with various attributes to test filtering logic.
 """
 
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ProductTable:
+    """
+    Column-oriented (struct-of-arrays) view of a product pool.
+
+    Row i of every column describes products[i], so vectorized steps can
+    scan contiguous numeric arrays and pass around index arrays instead of
+    product dicts.
+    """
+    products: tuple
+    asin: np.ndarray     # object (str)
+    title: np.ndarray    # object (str)
+    price: np.ndarray    # float64
+    rating: np.ndarray   # float64
+    reviews: np.ndarray  # int64
+
+    @classmethod
+    def from_products(cls, products: Sequence[Mapping[str, Any]]) -> "ProductTable":
+        """Build read-only columns from a sequence of product mappings."""
+        columns = {
+            "asin": np.array([p["asin"] for p in products], dtype=object),
+            "title": np.array([p["title"] for p in products], dtype=object),
+            "price": np.array([p["price"] for p in products], dtype=np.float64),
+            "rating": np.array([p["rating"] for p in products], dtype=np.float64),
+            "reviews": np.array([p["reviews"] for p in products], dtype=np.int64),
+        }
+        for column in columns.values():
+            column.flags.writeable = False
+        return cls(products=tuple(products), **columns)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+
 # Reference product (seller's product)
 REFERENCE_PRODUCT = {
     "asin": "B0XYZ123",
@@ -15,7 +56,7 @@ REFERENCE_PRODUCT = {
 }
 
 # Pool of candidate products with diverse attributes
-PRODUCT_POOL = [
+_RAW_PRODUCT_POOL = [
     # High-quality competitors (should pass filters)
     {
         "asin": "B0COMP01",
@@ -180,3 +221,9 @@ PRODUCT_POOL = [
         "category": "Sports & Outdoors > Water Bottles"
     }
 ]
+
+# Read-only view of the pool; products are shared by every pipeline run
+PRODUCT_POOL = tuple(MappingProxyType(p) for p in _RAW_PRODUCT_POOL)
+
+# Columns parallel to PRODUCT_POOL for vectorized filtering and ranking
+PRODUCT_TABLE = ProductTable.from_products(PRODUCT_POOL)
@@ -4,6 +4,7 @@ Competitor selection pipeline demo.
 Demonstrates the DecisionTrace X-Ray SDK with a 3-step workflow.
 """
 
+import re
 import sys
 from pathlib import Path
 
@@ -11,16 +12,41 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from decisiontrace import XRay
-from demo.data.products import REFERENCE_PRODUCT, PRODUCT_POOL
+from demo.data.products import REFERENCE_PRODUCT, PRODUCT_POOL, PRODUCT_TABLE
 from demo.steps.keywords import generate_keywords
 from demo.steps.search import search_products
-from demo.steps.filter import apply_filters, rank_and_select
+from demo.steps.filter import (
+    apply_filters,
+    rank_and_select,
+    PRICE_MIN_FACTOR,
+    PRICE_MAX_FACTOR,
+    MIN_RATING,
+    MIN_REVIEWS,
+)
+
+# Title phrase -> attribute reported in the keyword step's reasoning
+TITLE_ATTRIBUTES = {
+    "stainless steel": "material (stainless steel)",
+    "32oz": "capacity (32oz)",
+    "insulated": "feature (insulated)",
+}
+# All phrases in one alternation, so the title is scanned once
+_TITLE_ATTRIBUTE_RE = re.compile("|".join(re.escape(phrase) for phrase in TITLE_ATTRIBUTES))
 
 
 def run_competitor_selection_pipeline():
     """
     Run the complete competitor selection pipeline with X-Ray tracing.
     """
+    # Reference product as reported in the filter and ranking step inputs
+    ref_summary = {
+        "asin": REFERENCE_PRODUCT["asin"],
+        "title": REFERENCE_PRODUCT["title"],
+        "price": REFERENCE_PRODUCT["price"],
+        "rating": REFERENCE_PRODUCT["rating"],
+        "reviews": REFERENCE_PRODUCT["reviews"]
+    }
+
     # Initialize X-Ray SDK
     xray = XRay()
 
@@ -41,11 +67,11 @@ def run_competitor_selection_pipeline():
                 "category": REFERENCE_PRODUCT["category"]
             })
 
-            # Generate keywords
-            keywords = generate_keywords(
+            # Generate keywords (copied, since the cached tuple is shared)
+            keywords = list(generate_keywords(
                 REFERENCE_PRODUCT["title"],
                 REFERENCE_PRODUCT["category"]
-            )
+            ))
 
             step.set_output({
                 "keywords": keywords,
@@ -53,16 +79,13 @@ def run_competitor_selection_pipeline():
             })
 
             # Build dynamic reasoning based on what was actually extracted
-            attributes_found = []
             title_lower = REFERENCE_PRODUCT["title"].lower()
 
-            # Check what attributes were identified
-            if "stainless steel" in title_lower:
-                attributes_found.append("material (stainless steel)")
-            if "32oz" in title_lower:
-                attributes_found.append("capacity (32oz)")
-            if "insulated" in title_lower:
-                attributes_found.append("feature (insulated)")
+            # Check what attributes were identified (reported in declaration order)
+            phrases_found = set(_TITLE_ATTRIBUTE_RE.findall(title_lower))
+            attributes_found = [
+                label for phrase, label in TITLE_ATTRIBUTES.items() if phrase in phrases_found
+            ]
 
             # Generate dynamic reasoning
             if attributes_found:
@@ -123,8 +146,8 @@ def run_competitor_selection_pipeline():
             print(f"  Found {search_results['total_results']:,} total results")
             print(f"  Fetched {search_results['candidates_fetched']} candidates")
 
-            # Store full candidates for next step
-            candidates = search_results["candidates"]
+            # Store candidate rows for next step
+            candidate_indices = search_results["candidate_indices"]
 
         # ─────────────────────────────────────────────────────
         # Step 3: Apply Filters
@@ -133,44 +156,31 @@ def run_competitor_selection_pipeline():
             print("\n[STEP 3] Applying filters to candidates...")
 
             step.set_input({
-                "candidates_count": len(candidates),
-                "reference_product": {
-                    "asin": REFERENCE_PRODUCT["asin"],
-                    "title": REFERENCE_PRODUCT["title"],
-                    "price": REFERENCE_PRODUCT["price"],
-                    "rating": REFERENCE_PRODUCT["rating"],
-                    "reviews": REFERENCE_PRODUCT["reviews"]
-                }
+                "candidates_count": len(candidate_indices),
+                "reference_product": ref_summary
             })
 
             # Apply filters
-            filter_results = apply_filters(candidates, REFERENCE_PRODUCT)
+            filter_results = apply_filters(PRODUCT_TABLE, candidate_indices, REFERENCE_PRODUCT)
 
             # Set metadata with evaluations (using helper method)
-            for evaluation in filter_results["evaluations"]:
-                step.add_evaluation(
-                    item_id=evaluation["item_id"],
-                    item_data=evaluation["item_data"],
-                    filters=evaluation["filters"],
-                    qualified=evaluation["qualified"],
-                    reasoning=evaluation["reasoning"]
-                )
+            step.add_evaluations(filter_results["evaluations"])
 
             # Also set high-level metadata
             step.set_metadata({
                 "filters_applied": {
                     "price_range": {
-                        "min": REFERENCE_PRODUCT["price"] * 0.5,
-                        "max": REFERENCE_PRODUCT["price"] * 2.0,
-                        "rule": "0.5x - 2x of reference price"
+                        "min": REFERENCE_PRODUCT["price"] * PRICE_MIN_FACTOR,
+                        "max": REFERENCE_PRODUCT["price"] * PRICE_MAX_FACTOR,
+                        "rule": f"{PRICE_MIN_FACTOR:g}x - {PRICE_MAX_FACTOR:g}x of reference price"
                     },
                     "min_rating": {
-                        "value": 3.8,
-                        "rule": "Must be at least 3.8 stars"
+                        "value": MIN_RATING,
+                        "rule": f"Must be at least {MIN_RATING} stars"
                     },
                     "min_reviews": {
-                        "value": 100,
-                        "rule": "Must have at least 100 reviews"
+                        "value": MIN_REVIEWS,
+                        "rule": f"Must have at least {MIN_REVIEWS} reviews"
                     }
                 }
             })
@@ -190,8 +200,8 @@ def run_competitor_selection_pipeline():
             print(f"  ✓ Passed: {filter_results['passed']}")
             print(f"  ✗ Failed: {filter_results['failed']}")
 
-            # Store qualified candidates for next step
-            qualified_candidates = filter_results["qualified_candidates"]
+            # Store qualified rows for next step
+            qualified_indices = filter_results["qualified_indices"]
 
         # ─────────────────────────────────────────────────────
         # Step 4: Rank and Select
@@ -200,18 +210,12 @@ def run_competitor_selection_pipeline():
             print("\n[STEP 4] Ranking and selecting best competitor...")
 
             step.set_input({
-                "candidates_count": len(qualified_candidates),
-                "reference_product": {
-                    "asin": REFERENCE_PRODUCT["asin"],
-                    "title": REFERENCE_PRODUCT["title"],
-                    "price": REFERENCE_PRODUCT["price"],
-                    "rating": REFERENCE_PRODUCT["rating"],
-                    "reviews": REFERENCE_PRODUCT["reviews"]
-                }
+                "candidates_count": len(qualified_indices),
+                "reference_product": ref_summary
             })
 
             # Rank and select
-            ranking_results = rank_and_select(qualified_candidates, REFERENCE_PRODUCT)
+            ranking_results = rank_and_select(PRODUCT_TABLE, qualified_indices, REFERENCE_PRODUCT)
 
             step.set_metadata({
                 "ranking_criteria": {
@@ -4,11 +4,22 @@ Filter and selection logic for competitor products.
 Applies business rules and ranking to select the best competitor.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Tuple
+
+import numpy as np
+
+from demo.data.products import ProductTable
+
+# Filter thresholds (price range is relative to the reference price)
+PRICE_MIN_FACTOR = 0.5
+PRICE_MAX_FACTOR = 2.0
+MIN_RATING = 3.8
+MIN_REVIEWS = 100
 
 
 def apply_filters(
-    candidates: List[Dict[str, Any]],
+    table: ProductTable,
+    candidate_indices: np.ndarray,
     reference_product: Dict[str, Any]
 ) -> Dict[str, Any]:
     """
@@ -20,73 +31,140 @@ def apply_filters(
     - Reviews: minimum 100 reviews
 
     Args:
-        candidates: List of candidate products
+        table: Column view of the product pool
+        candidate_indices: Rows of the table to evaluate
         reference_product: Reference product for comparison
 
     Returns:
-        Dict with filter results and qualified candidates
+        Dict with filter results and the table rows that qualified.
+        "evaluations" is a one-shot iterator of per-candidate evaluation
+        records.
     """
     ref_price = reference_product["price"]
-    price_min = ref_price * 0.5
-    price_max = ref_price * 2.0
-
-    evaluations = []
-    qualified_candidates = []
-
-    for candidate in candidates:
-        # Evaluate each filter
-        price_check = {
-            "name": "price_range",
-            "passed": price_min <= candidate["price"] <= price_max,
-            "detail": f"${candidate['price']:.2f} {'is within' if price_min <= candidate['price'] <= price_max else 'outside'} ${price_min:.2f}-${price_max:.2f}"
-        }
+    price_min = ref_price * PRICE_MIN_FACTOR
+    price_max = ref_price * PRICE_MAX_FACTOR
+    # Shared by every price detail string
+    price_range = f"${price_min:.2f}-${price_max:.2f}"
 
-        rating_check = {
-            "name": "min_rating",
-            "passed": candidate["rating"] >= 3.8,
-            "detail": f"{candidate['rating']} {'>=' if candidate['rating'] >= 3.8 else '<'} 3.8 threshold"
-        }
+    # Evaluate every filter for all candidates at once
+    candidate_indices = np.asarray(candidate_indices, dtype=np.intp)
+    prices = table.price[candidate_indices]
+    ratings = table.rating[candidate_indices]
+    reviews = table.reviews[candidate_indices]
 
-        reviews_check = {
-            "name": "min_reviews",
-            "passed": candidate["reviews"] >= 100,
-            "detail": f"{candidate['reviews']} {'>=' if candidate['reviews'] >= 100 else '<'} 100 minimum"
-        }
+    passed_price, passed_rating, passed_reviews, qualified_mask = _filter_kernel(
+        prices, ratings, reviews, price_min, price_max
+    )
+
+    qualified_indices = candidate_indices[qualified_mask]
 
-        # Determine if candidate qualifies
-        filters = [price_check, rating_check, reviews_check]
-        qualified = all(f["passed"] for f in filters)
+    return {
+        # Built lazily as the caller consumes them
+        "evaluations": _iter_evaluations(
+            table.asin[candidate_indices].tolist(),
+            table.title[candidate_indices].tolist(),
+            prices.tolist(),
+            ratings.tolist(),
+            reviews.tolist(),
+            passed_price.tolist(),
+            passed_rating.tolist(),
+            passed_reviews.tolist(),
+            qualified_mask.tolist(),
+            price_range
+        ),
+        "qualified_indices": qualified_indices,
+        "total_evaluated": len(candidate_indices),
+        "passed": len(qualified_indices),
+        "failed": len(candidate_indices) - len(qualified_indices)
+    }
 
-        # Build evaluation record
-        evaluation = {
-            "item_id": candidate["asin"],
+
+def _filter_kernel(
+    prices: np.ndarray,
+    ratings: np.ndarray,
+    reviews: np.ndarray,
+    price_min: float,
+    price_max: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Evaluate the numeric filter predicates over whole columns.
+
+    Returns the per-filter pass masks and their conjunction. Every mask
+    is needed for the evaluation records, so none is skipped.
+    """
+    passed_price = prices >= price_min
+    passed_price &= prices <= price_max
+    passed_rating = ratings >= MIN_RATING
+    passed_reviews = reviews >= MIN_REVIEWS
+
+    qualified = passed_reviews & passed_rating & passed_price
+    return passed_price, passed_rating, passed_reviews, qualified
+
+
+def _iter_evaluations(
+    asins: List[str],
+    titles: List[str],
+    prices: List[float],
+    ratings: List[float],
+    reviews: List[int],
+    passed_price: List[bool],
+    passed_rating: List[bool],
+    passed_reviews: List[bool],
+    qualified: List[bool],
+    price_range: str
+) -> Iterator[Dict[str, Any]]:
+    """Yield an evaluation record per candidate from precomputed filter outcomes."""
+    for asin, title, price, rating, review_count, price_ok, rating_ok, reviews_ok, is_qualified in zip(
+        asins, titles, prices, ratings, reviews,
+        passed_price, passed_rating, passed_reviews, qualified
+    ):
+        filters = [
+            {
+                "name": "price_range",
+                "passed": price_ok,
+                "detail": f"${price:.2f} {'is within' if price_ok else 'outside'} {price_range}"
+            },
+            {
+                "name": "min_rating",
+                "passed": rating_ok,
+                "detail": f"{rating} {'>=' if rating_ok else '<'} {MIN_RATING} threshold"
+            },
+            {
+                "name": "min_reviews",
+                "passed": reviews_ok,
+                "detail": f"{review_count} {'>=' if reviews_ok else '<'} {MIN_REVIEWS} minimum"
+            }
+        ]
+
+        yield {
+            "item_id": asin,
             "item_data": {
-                "title": candidate["title"],
-                "price": candidate["price"],
-                "rating": candidate["rating"],
-                "reviews": candidate["reviews"]
+                "title": title,
+                "price": price,
+                "rating": rating,
+                "reviews": review_count
             },
             "filters": filters,
-            "qualified": qualified,
-            "reasoning": "Passed all filters" if qualified else f"Failed: {', '.join(f['name'] for f in filters if not f['passed'])}"
+            "qualified": is_qualified,
+            "reasoning": "Passed all filters" if is_qualified else _failure_reasoning(price_ok, rating_ok, reviews_ok)
         }
 
-        evaluations.append(evaluation)
 
-        if qualified:
-            qualified_candidates.append(candidate)
-
-    return {
-        "evaluations": evaluations,
-        "qualified_candidates": qualified_candidates,
-        "total_evaluated": len(candidates),
-        "passed": len(qualified_candidates),
-        "failed": len(candidates) - len(qualified_candidates)
-    }
+def _failure_reasoning(price_ok: bool, rating_ok: bool, reviews_ok: bool) -> str:
+    """Name the failed filters straight from their outcomes."""
+    failed = []
+    if not price_ok:
+        failed.append("price_range")
+    if not rating_ok:
+        failed.append("min_rating")
+    if not reviews_ok:
+        failed.append("min_reviews")
+    return f"Failed: {', '.join(failed)}"
 
 
 def rank_and_select(
-    qualified_candidates: List[Dict[str, Any]],
+    table: ProductTable,
+    qualified_indices: np.ndarray,
     reference_product: Dict[str, Any]
 ) -> Dict[str, Any]:
     """
@@ -98,13 +176,14 @@ def rank_and_select(
     - Tertiary: Price proximity to reference
 
     Args:
-        qualified_candidates: List of candidates that passed filters
+        table: Column view of the product pool
+        qualified_indices: Rows of the table that passed filters
         reference_product: Reference product for comparison
 
     Returns:
         Dict with ranked candidates and final selection
     """
-    if not qualified_candidates:
+    if len(qualified_indices) == 0:
         return {
             "ranked_candidates": [],
             "selection": None,
@@ -113,68 +192,83 @@ def rank_and_select(
 
     ref_price = reference_product["price"]
 
-    # Calculate scores for each candidate
-    max_reviews = max(c["reviews"] for c in qualified_candidates)
-    max_rating = 5.0
+    # Score all candidates at once from their numeric columns
+    qualified_indices = np.asarray(qualified_indices, dtype=np.intp)
+    reviews = table.reviews[qualified_indices]
+    ratings = table.rating[qualified_indices]
+    prices = table.price[qualified_indices]
 
-    scored_candidates = []
-    for candidate in qualified_candidates:
-        # Normalize scores (0-1 range)
-        review_count_score = candidate["reviews"] / max_reviews if max_reviews > 0 else 0
-        rating_score = candidate["rating"] / max_rating
-
-        # Price proximity score (closer to reference = higher score)
-        price_diff = abs(candidate["price"] - ref_price)
-        max_price_diff = ref_price  # Maximum expected difference
-        price_proximity_score = 1 - min(price_diff / max_price_diff, 1)
-
-        # Weighted total score (review count is most important)
-        total_score = (
-            review_count_score * 0.5 +  # 50% weight
-            rating_score * 0.3 +          # 30% weight
-            price_proximity_score * 0.2   # 20% weight
+    # Normalize scores (0-1 range)
+    max_reviews = reviews.max()
+    max_rating = 5.0
+    review_count_score = reviews / max_reviews if max_reviews > 0 else np.zeros(len(reviews))
+    rating_score = ratings / max_rating
+
+    # Price proximity score (closer to reference = higher score);
+    # the reference price is the maximum expected difference
+    price_proximity_score = 1 - np.minimum(np.abs(prices - ref_price) / ref_price, 1)
+
+    # Weighted total score (review count is most important)
+    total_score = (
+        review_count_score * 0.5 +  # 50% weight
+        rating_score * 0.3 +          # 30% weight
+        price_proximity_score * 0.2   # 20% weight
+    )
+
+    # Python's round, not np.round: np.round scales by 100 first, which
+    # moves ratios that land on a half (e.g. 312 / 4800 = 0.065)
+    scores = [
+        {
+            "review_count_score": round(review, 2),
+            "rating_score": round(rating, 2),
+            "price_proximity_score": round(proximity, 2),
+            "total_score": round(total, 2)
+        }
+        for review, rating, proximity, total in zip(
+            review_count_score.tolist(),
+            rating_score.tolist(),
+            price_proximity_score.tolist(),
+            total_score.tolist()
         )
-
-        scored_candidates.append({
-            "candidate": candidate,
-            "scores": {
-                "review_count_score": round(review_count_score, 2),
-                "rating_score": round(rating_score, 2),
-                "price_proximity_score": round(price_proximity_score, 2),
-                "total_score": round(total_score, 2)
-            }
-        })
+    ]
 
     # Sort by total score (highest first)
-    scored_candidates.sort(key=lambda x: x["scores"]["total_score"], reverse=True)
+    order = sorted(range(len(scores)), key=lambda i: scores[i]["total_score"], reverse=True)
+
+    # Output dicts are only built here, from the qualified rows' columns
+    asins = table.asin[qualified_indices].tolist()
+    titles = table.title[qualified_indices].tolist()
+    price_values = prices.tolist()
+    rating_values = ratings.tolist()
+    review_values = reviews.tolist()
 
     # Build ranked list
-    ranked_candidates = []
-    for idx, sc in enumerate(scored_candidates, start=1):
-        candidate = sc["candidate"]
-        ranked_candidates.append({
-            "rank": idx,
-            "asin": candidate["asin"],
-            "title": candidate["title"],
+    ranked_candidates = [
+        {
+            "rank": rank,
+            "asin": asins[i],
+            "title": titles[i],
             "metrics": {
-                "price": candidate["price"],
-                "rating": candidate["rating"],
-                "reviews": candidate["reviews"]
+                "price": price_values[i],
+                "rating": rating_values[i],
+                "reviews": review_values[i]
             },
-            "score_breakdown": sc["scores"]
-        })
+            "score_breakdown": scores[i]
+        }
+        for rank, i in enumerate(order, start=1)
+    ]
 
     # Select top candidate
-    top_candidate = scored_candidates[0]["candidate"]
-    top_scores = scored_candidates[0]["scores"]
+    top = order[0]
+    top_scores = scores[top]
 
     selection = {
-        "asin": top_candidate["asin"],
-        "title": top_candidate["title"],
-        "price": top_candidate["price"],
-        "rating": top_candidate["rating"],
-        "reviews": top_candidate["reviews"],
-        "reason": f"Highest overall score ({top_scores['total_score']}) - top review count ({top_candidate['reviews']:,}) with strong rating ({top_candidate['rating']}★)"
+        "asin": asins[top],
+        "title": titles[top],
+        "price": price_values[top],
+        "rating": rating_values[top],
+        "reviews": review_values[top],
+        "reason": f"Highest overall score ({top_scores['total_score']}) - top review count ({review_values[top]:,}) with strong rating ({rating_values[top]}★)"
     }
 
     return {
@@ -5,30 +5,38 @@ Simulates an LLM extracting search keywords from product attributes.
 """
 
 import re
+from functools import lru_cache
 
+# Common words dropped from keywords
+_STOP_WORDS = frozenset({'the', 'a', 'an', 'with', 'for', 'and', 'or', 'of', 'in', 'on'})
 
-def generate_keywords(product_title: str, category: str) -> list[str]:
+# Capacity such as "32oz" or "24oz"
+_CAPACITY_RE = re.compile(r'\d+oz')
+
+
+@lru_cache(maxsize=1024)
+def generate_keywords(product_title: str, category: str) -> tuple[str, ...]:
     """
     Mock LLM keyword generation.
 
     Extracts key attributes from product title using simple string manipulation.
+    Results are memoized per (title, category), so they are returned as an
+    immutable tuple shared between callers.
 
     Args:
         product_title: Product title
         category: Product category
 
     Returns:
-        List of search keywords
+        Tuple of search keywords
     """
-    # Remove common stop words
-    stop_words = {'the', 'a', 'an', 'with', 'for', 'and', 'or', 'of', 'in', 'on'}
-
-    # Convert to lowercase and split
-    words = product_title.lower().split()
-    filtered_words = [w for w in words if w not in stop_words]
+    # Convert to lowercase once, split and remove common stop words
+    title_lower = product_title.lower()
+    words = title_lower.split()
+    filtered_words = [w for w in words if w not in _STOP_WORDS]
 
     # Extract capacity if present (e.g., "32oz", "24oz")
-    capacity_match = re.search(r'\d+oz', product_title.lower())
+    capacity_match = _CAPACITY_RE.search(title_lower)
     capacity = capacity_match.group() if capacity_match else None
 
     # Build primary keyword (full product description)
@@ -39,7 +47,7 @@ def generate_keywords(product_title: str, category: str) -> list[str]:
 
     # Add variation with capacity
     if capacity:
-        variation = f"{'insulated' if 'insulated' in product_title.lower() else ''} bottle {capacity}"
+        variation = f"{'insulated' if 'insulated' in title_lower else ''} bottle {capacity}"
         keywords.append(variation.strip())
 
-    return keywords
+    return tuple(keywords)
@@ -4,11 +4,55 @@ Candidate search step (mock API).
 Simulates a product search API returning candidate products.
 """
 
+import heapq
 import random
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence, Tuple
 
+import numpy as np
 
-def search_products(keyword: str, product_pool: List[Dict[str, Any]], limit: int = 50) -> Dict[str, Any]:
+# Simulated size of the full result set, per product in the pool
+RESULTS_PER_PRODUCT = 50
+
+# (lowercased titles, term -> indices of products whose title has the term)
+SearchIndex = Tuple[np.ndarray, Dict[str, np.ndarray]]
+
+# Indexes for immutable (tuple) pools, built on first search and reused.
+# The pool is stored alongside its index so its id can't be recycled; only
+# the most recently indexed pools are kept, so pools aren't held forever.
+INDEX_CACHE_MAX_POOLS = 4
+_index_cache: Dict[int, Tuple[Sequence[Dict[str, Any]], SearchIndex]] = {}
+
+
+def _build_index(product_pool: Sequence[Dict[str, Any]]) -> SearchIndex:
+    """Tokenize every title once into an inverted index."""
+    titles_lower = [product["title"].lower() for product in product_pool]
+
+    postings: Dict[str, List[int]] = {}
+    for idx, title_lower in enumerate(titles_lower):
+        for term in set(title_lower.split()):
+            postings.setdefault(term, []).append(idx)
+
+    inverted = {term: np.array(indices, dtype=np.intp) for term, indices in postings.items()}
+    return np.array(titles_lower, dtype=str), inverted
+
+
+def _get_index(product_pool: Sequence[Dict[str, Any]]) -> SearchIndex:
+    """Return the search index for a pool, caching it if the pool is immutable."""
+    if not isinstance(product_pool, tuple):
+        return _build_index(product_pool)
+
+    cached = _index_cache.get(id(product_pool))
+    if cached is None or cached[0] is not product_pool:
+        cached = (product_pool, _build_index(product_pool))
+        _index_cache.pop(id(product_pool), None)
+        if len(_index_cache) >= INDEX_CACHE_MAX_POOLS:
+            # Evict the oldest entry
+            _index_cache.pop(next(iter(_index_cache)))
+        _index_cache[id(product_pool)] = cached
+    return cached[1]
+
+
+def search_products(keyword: str, product_pool: Sequence[Dict[str, Any]], limit: int = 50) -> Dict[str, Any]:
     """
     Mock product search API.
 
@@ -20,49 +64,51 @@ def search_products(keyword: str, product_pool: List[Dict[str, Any]], limit: int
         limit: Maximum number of results to return
 
     Returns:
-        Dict with total_results, candidates_fetched, and candidates list
+        Dict with total_results, candidates_fetched, candidates list and
+        the candidates' indices into product_pool
     """
     # Simple keyword matching (case-insensitive)
     keyword_lower = keyword.lower()
     keyword_terms = set(keyword_lower.split())
-
-    # Score each product by keyword relevance
-    scored_products = []
-    for product in product_pool:
-        title_lower = product["title"].lower()
-        title_terms = set(title_lower.split())
-
-        # Count matching terms
-        matching_terms = keyword_terms.intersection(title_terms)
-        relevance_score = len(matching_terms)
-
-        # Bonus for exact phrase match
-        if keyword_lower in title_lower:
-            relevance_score += 10
-
-        scored_products.append({
-            "product": product,
-            "score": relevance_score
-        })
-
-    # Sort by relevance score (highest first)
-    scored_products.sort(key=lambda x: x["score"], reverse=True)
-
-    # Filter out products with score 0 (no matches)
-    relevant_products = [sp["product"] for sp in scored_products if sp["score"] > 0]
-
-    # If we have fewer relevant products than requested, add some random ones
-    if len(relevant_products) < limit:
-        remaining_products = [p for p in product_pool if p not in relevant_products]
-        random.shuffle(remaining_products)
-        additional_count = min(limit - len(relevant_products), len(remaining_products))
-        relevant_products.extend(remaining_products[:additional_count])
+    titles_lower, inverted = _get_index(product_pool)
+
+    # Score each product by the number of keyword terms in its title,
+    # visiting only the products that contain each term
+    scores = np.zeros(len(product_pool), dtype=np.int32)
+    for term in keyword_terms:
+        indices = inverted.get(term)
+        if indices is not None:
+            scores[indices] += 1
+
+    # Bonus for exact phrase match
+    scores[np.char.find(titles_lower, keyword_lower) >= 0] += 10
+
+    # Products with a match, highest score first. Only the top `limit` are
+    # returned, so select them without sorting every match; nlargest is
+    # stable, so ties keep pool order.
+    matched = np.flatnonzero(scores).tolist()
+    score_of = scores.tolist()
+    if len(matched) > limit:
+        matched = heapq.nlargest(limit, matched, key=score_of.__getitem__)
+    else:
+        matched.sort(key=score_of.__getitem__, reverse=True)
+
+    # If we have fewer relevant products than requested, add some random ones.
+    # Every match was kept, so the rest of the pool is exactly the zero scores.
+    if len(matched) < limit:
+        remaining = np.flatnonzero(scores == 0).tolist()
+        additional_count = min(limit - len(matched), len(remaining))
+        # Draw only the products needed instead of shuffling the whole rest
+        matched.extend(random.sample(remaining, additional_count))
 
     # Return top N results
-    candidates = relevant_products[:limit]
+    candidate_indices = matched[:limit]
+    candidates = [product_pool[i] for i in candidate_indices]
 
     return {
-        "total_results": len(product_pool) * 50,  # Simulate large result set
+        "total_results": len(product_pool) * RESULTS_PER_PRODUCT,  # Simulate large result set
         "candidates_fetched": len(candidates),
-        "candidates": candidates
+        "candidates": candidates,
+        # Positions in product_pool, for steps that work on column views
+        "candidate_indices": np.array(candidate_indices, dtype=np.intp)
     }
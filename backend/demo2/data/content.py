@@ -4,6 +4,130 @@ Dummy content data for content recommendation demo.
 Simulates a content recommendation system for a streaming platform.
 """
 
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping, Sequence
+
+import numpy as np
+
+# Constants behind the query-independent score columns
+MAX_RATING = 5.0
+CURRENT_YEAR = 2024
+RECENCY_DECAY_YEARS = 20
+
+# Unsigned words for code bitmaps, narrowest first
+_BITMAP_DTYPES = (np.uint8, np.uint16, np.uint32, np.uint64)
+
+
+@dataclass(frozen=True)
+class ContentTable:
+    """
+    Column-oriented (struct-of-arrays) view of a content pool.
+
+    Row i of every column describes content[i], so vectorized steps can
+    evaluate predicates over whole columns and pass around index arrays
+    instead of content dicts. Genre, language and type are also
+    integer-encoded (*_id columns) for comparisons; the string columns are
+    kept for display. Score components that don't depend on the user
+    (rating_score, recency_score) are computed once here.
+    """
+    content: tuple
+    content_id: np.ndarray        # object (str)
+    title: np.ndarray             # object (str)
+    genre: np.ndarray             # object (str)
+    type: np.ndarray              # object (str)
+    language: np.ndarray          # object (str)
+    rating: np.ndarray            # float64
+    views: np.ndarray             # int64
+    popularity_score: np.ndarray  # float64
+    release_year: np.ndarray      # int64
+    rating_score: np.ndarray      # float64, rating / MAX_RATING
+    recency_score: np.ndarray     # float64, decays to 0 over RECENCY_DECAY_YEARS
+    genre_id: np.ndarray          # int16, code in genre_codes
+    type_id: np.ndarray           # int16, code in type_codes
+    language_id: np.ndarray       # int16, code in language_codes
+    genre_codes: Mapping[str, int]
+    type_codes: Mapping[str, int]
+    language_codes: Mapping[str, int]
+
+    @classmethod
+    def from_content(cls, content: Sequence[Mapping[str, Any]]) -> "ContentTable":
+        """Build read-only columns from a sequence of content mappings."""
+        genres = [c["genre"] for c in content]
+        types = [c["type"] for c in content]
+        languages = [c["language"] for c in content]
+        ratings = np.array([c["rating"] for c in content], dtype=np.float64)
+        release_years = np.array([c["release_year"] for c in content], dtype=np.int64)
+        genre_codes = _label_codes(genres)
+        type_codes = _label_codes(types)
+        language_codes = _label_codes(languages)
+
+        columns = {
+            "content_id": np.array([c["content_id"] for c in content], dtype=object),
+            "title": np.array([c["title"] for c in content], dtype=object),
+            "genre": np.array(genres, dtype=object),
+            "type": np.array(types, dtype=object),
+            "language": np.array(languages, dtype=object),
+            "rating": ratings,
+            "views": np.array([c["views"] for c in content], dtype=np.int64),
+            "popularity_score": np.array([c["popularity_score"] for c in content], dtype=np.float64),
+            "release_year": release_years,
+            "rating_score": ratings / MAX_RATING,
+            "recency_score": np.maximum(0, 1 - ((CURRENT_YEAR - release_years) / RECENCY_DECAY_YEARS)),
+            "genre_id": np.array([genre_codes[g] for g in genres], dtype=np.int16),
+            "type_id": np.array([type_codes[t] for t in types], dtype=np.int16),
+            "language_id": np.array([language_codes[lang] for lang in languages], dtype=np.int16),
+        }
+        for column in columns.values():
+            column.flags.writeable = False
+        return cls(
+            content=tuple(content),
+            genre_codes=genre_codes,
+            type_codes=type_codes,
+            language_codes=language_codes,
+            **columns
+        )
+
+    @staticmethod
+    def codes_of(codes: Mapping[str, int], labels: Iterable[str]) -> np.ndarray:
+        """
+        Codes of the given labels. Labels that no row has are dropped,
+        since they can't match anything.
+        """
+        return np.array([codes[label] for label in labels if label in codes], dtype=np.int16)
+
+    @staticmethod
+    def in_codes(ids: np.ndarray, codes: Mapping[str, int], labels: Iterable[str]) -> np.ndarray:
+        """
+        Mask of the entries of an *_id column whose code is one of the
+        labels' codes.
+
+        With at most 64 codes, the accepted codes are packed as bits of the
+        narrowest unsigned word that holds them all and every entry is a
+        branchless shift-and-mask test. Larger code tables use a per-code
+        lookup table.
+        """
+        accepted = ContentTable.codes_of(codes, labels).tolist()
+        for dtype in _BITMAP_DTYPES:
+            if len(codes) <= np.iinfo(dtype).bits:
+                bitmap = 0
+                for code in accepted:
+                    bitmap |= 1 << code
+                return ((dtype(bitmap) >> ids.astype(dtype)) & 1).astype(bool)
+
+        lookup = np.zeros(len(codes), dtype=bool)
+        lookup[accepted] = True
+        return np.take(lookup, ids)
+
+    def __len__(self) -> int:
+        return len(self.content)
+
+
+def _label_codes(labels: Iterable[str]) -> Mapping[str, int]:
+    """Read-only label -> code table, codes assigned in sorted label order."""
+    return MappingProxyType({label: code for code, label in enumerate(sorted(set(labels)))})
+
+
 # User profile (viewer requesting recommendations)
 USER_PROFILE = {
     "user_id": "user_12345",
@@ -25,7 +149,7 @@ USER_PROFILE = {
 }
 
 # Content pool (available content)
-CONTENT_POOL = [
+_RAW_CONTENT_POOL = [
     # Sci-fi content (should rank high)
     {
         "content_id": "C001",
@@ -318,3 +442,11 @@ CONTENT_POOL = [
         "tags": ["history", "royalty", "drama"]
     }
 ]
+
+# Read-only view of the pool; content is shared by every pipeline run
+CONTENT_POOL = tuple(
+    MappingProxyType({**c, "tags": tuple(c["tags"])}) for c in _RAW_CONTENT_POOL
+)
+
+# Columns parallel to CONTENT_POOL for vectorized filtering and ranking
+CONTENT_TABLE = ContentTable.from_content(CONTENT_POOL)
@@ -5,13 +5,14 @@ Demonstrates the DecisionTrace X-Ray SDK with a content recommendation workflow.
 """
 
 import sys
+from collections import Counter
 from pathlib import Path
 
 # Add parent directory to path to import decisiontrace
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from decisiontrace import XRay
-from demo2.data.content import USER_PROFILE, CONTENT_POOL
+from demo2.data.content import USER_PROFILE, CONTENT_POOL, CONTENT_TABLE
 from demo2.steps.profile_analysis import analyze_user_profile
 from demo2.steps.content_filter import filter_content
 from demo2.steps.ranking import rank_and_diversify
@@ -51,8 +52,18 @@ def run_content_recommendation_pipeline():
             # Analyze profile
             criteria = analyze_user_profile(USER_PROFILE)
 
+            # Preference sets as sorted lists, for the trace and display
+            preferred_genres = sorted(criteria["preferred_genres"])
+            preferred_languages = sorted(criteria["preferred_languages"])
+            preferred_content_types = sorted(criteria["preferred_content_types"])
+
             step.set_output({
-                "criteria": criteria
+                "criteria": {
+                    **criteria,
+                    "preferred_genres": preferred_genres,
+                    "preferred_languages": preferred_languages,
+                    "preferred_content_types": preferred_content_types
+                }
             })
 
             step.set_reasoning(
@@ -68,7 +79,7 @@ def run_content_recommendation_pipeline():
                 "user_segment": criteria["engagement_level"]
             })
 
-            print(f"  Preferred genres: {criteria['preferred_genres']}")
+            print(f"  Preferred genres: {preferred_genres}")
             print(f"  Minimum rating: {criteria['minimum_rating_threshold']}★")
             print(f"  Engagement: {criteria['engagement_level']}")
 
@@ -80,8 +91,8 @@ def run_content_recommendation_pipeline():
 
             step.set_input({
                 "catalog_query": {
-                    "genres": criteria["preferred_genres"],
-                    "languages": criteria["preferred_languages"]
+                    "genres": preferred_genres,
+                    "languages": preferred_languages
                 },
                 "limit": len(CONTENT_POOL)
             })
@@ -89,11 +100,14 @@ def run_content_recommendation_pipeline():
             # In real system, this would query a database
             retrieved_content = CONTENT_POOL
 
+            # Count every content type in one pass over the catalog
+            type_counts = Counter(c["type"] for c in retrieved_content)
+
             step.set_output({
                 "total_retrieved": len(retrieved_content),
                 "content_types": {
-                    "movie": len([c for c in retrieved_content if c["type"] == "movie"]),
-                    "series": len([c for c in retrieved_content if c["type"] == "series"])
+                    "movie": type_counts["movie"],
+                    "series": type_counts["series"]
                 },
                 "genre_distribution": {}
             })
@@ -114,45 +128,40 @@ def run_content_recommendation_pipeline():
             step.set_input({
                 "content_count": len(retrieved_content),
                 "filters": {
-                    "genre_match": criteria["preferred_genres"],
+                    "genre_match": preferred_genres,
                     "minimum_rating": criteria["minimum_rating_threshold"],
-                    "languages": criteria["preferred_languages"],
-                    "content_types": criteria["preferred_content_types"]
+                    "languages": preferred_languages,
+                    "content_types": preferred_content_types
                 }
             })
 
             # Apply filters
-            filter_results = filter_content(retrieved_content, criteria)
+            filter_results = filter_content(CONTENT_TABLE, criteria)
 
             # Set metadata with evaluations (using helper method)
-            for evaluation in filter_results["evaluations"]:
-                step.add_evaluation(
-                    item_id=evaluation["item_id"],
-                    item_data=evaluation["item_data"],
-                    filters=evaluation["filters"],
-                    qualified=evaluation["qualified"],
-                    reasoning=evaluation["reasoning"]
-                )
+            step.add_evaluations(filter_results["evaluations"])
+
+            pass_rate = round(filter_results["passed"] / filter_results["total_evaluated"] * 100, 1)
 
             step.set_output({
                 "total_evaluated": filter_results["total_evaluated"],
                 "passed": filter_results["passed"],
                 "failed": filter_results["failed"],
-                "pass_rate": round(filter_results["passed"] / filter_results["total_evaluated"] * 100, 1)
+                "pass_rate": pass_rate
             })
 
             step.set_reasoning(
                 f"Applied 4 filters (genre, rating, language, type) to narrow content "
                 f"from {filter_results['total_evaluated']} to {filter_results['passed']} items. "
-                f"Pass rate: {round(filter_results['passed'] / filter_results['total_evaluated'] * 100, 1)}%"
+                f"Pass rate: {pass_rate}%"
             )
 
             print(f"  Evaluated {filter_results['total_evaluated']} items")
             print(f"  ✓ Passed: {filter_results['passed']}")
             print(f"  ✗ Failed: {filter_results['failed']}")
 
-            # Store qualified content for next step
-            qualified_content = filter_results["qualified_content"]
+            # Store qualified rows for next step
+            qualified_indices = filter_results["qualified_indices"]
 
         # ─────────────────────────────────────────────────────
         # Step 4: Rank and Diversify
@@ -161,7 +170,7 @@ def run_content_recommendation_pipeline():
             print("\n[STEP 4] Ranking content and ensuring diversity...")
 
             step.set_input({
-                "qualified_count": len(qualified_content),
+                "qualified_count": len(qualified_indices),
                 "target_recommendations": 5,
                 "ranking_criteria": {
                     "primary": "relevance_score",
@@ -171,7 +180,7 @@ def run_content_recommendation_pipeline():
             })
 
             # Rank and diversify
-            ranking_results = rank_and_diversify(qualified_content, USER_PROFILE, top_n=5)
+            ranking_results = rank_and_diversify(CONTENT_TABLE, qualified_indices, USER_PROFILE, top_n=5)
 
             step.set_metadata({
                 "ranking_criteria": {
@@ -194,7 +203,7 @@ def run_content_recommendation_pipeline():
             })
 
             step.set_reasoning(
-                f"Ranked {len(qualified_content)} qualified items using relevance (50%), "
+                f"Ranked {len(qualified_indices)} qualified items using relevance (50%), "
                 f"popularity (30%), and recency (20%) weights. Applied diversity algorithm to "
                 f"ensure genre variety, achieving diversity score of {ranking_results['diversity_score']}"
             )
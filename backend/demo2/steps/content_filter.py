@@ -4,11 +4,15 @@ Content filtering step.
 Filters content based on user preferences and quality thresholds.
 """
 
-from typing import Dict, Any, List
+from typing import AbstractSet, Dict, Any, Iterator, List, Tuple
+
+import numpy as np
+
+from demo2.data.content import ContentTable
 
 
 def filter_content(
-    content_pool: List[Dict[str, Any]],
+    table: ContentTable,
     criteria: Dict[str, Any]
 ) -> Dict[str, Any]:
     """
@@ -21,79 +25,170 @@ def filter_content(
     - Content type (must match user's preferred types)
 
     Args:
-        content_pool: List of available content
+        table: Column view of the available content
         criteria: Recommendation criteria from profile analysis
 
     Returns:
-        Dict with filter results and qualified content
+        Dict with filter results and the table rows that qualified.
+        "evaluations" is a one-shot iterator of per-item evaluation records.
     """
-    evaluations = []
-    qualified_content = []
-
-    for content in content_pool:
-        # Genre filter
-        genre_match = content["genre"] in criteria["preferred_genres"]
-        genre_check = {
-            "name": "genre_match",
-            "passed": genre_match,
-            "detail": f"Genre '{content['genre']}' {'matches' if genre_match else 'does not match'} preferences {criteria['preferred_genres']}"
-        }
+    # English is always acceptable
+    accepted_languages = criteria["preferred_languages"] | {"english"}
 
-        # Rating filter
-        rating_check = {
-            "name": "minimum_rating",
-            "passed": content["rating"] >= criteria["minimum_rating_threshold"],
-            "detail": f"{content['rating']} {'>=' if content['rating'] >= criteria['minimum_rating_threshold'] else '<'} {criteria['minimum_rating_threshold']} threshold"
-        }
+    # Evaluate every filter for all content at once, on the label codes
+    genre_mask, rating_mask, language_mask, type_mask, qualified_mask = _filter_kernel(
+        table,
+        criteria["preferred_genres"],
+        accepted_languages,
+        criteria["preferred_content_types"],
+        criteria["minimum_rating_threshold"]
+    )
 
-        # Language filter (english is always acceptable)
-        language_match = (
-            content["language"] in criteria["preferred_languages"] or
-            content["language"] == "english"
-        )
-        language_check = {
-            "name": "language_support",
-            "passed": language_match,
-            "detail": f"Language '{content['language']}' {'is supported' if language_match else 'not supported'}"
-        }
+    qualified_indices = np.flatnonzero(qualified_mask)
 
-        # Content type filter
-        type_match = content["type"] in criteria["preferred_content_types"]
-        type_check = {
-            "name": "content_type",
-            "passed": type_match,
-            "detail": f"Type '{content['type']}' {'matches' if type_match else 'does not match'} preferences {criteria['preferred_content_types']}"
-        }
+    return {
+        # Built lazily as the caller consumes them
+        "evaluations": _iter_evaluations(
+            table,
+            criteria,
+            accepted_languages,
+            genre_mask.tolist(),
+            rating_mask.tolist(),
+            language_mask.tolist(),
+            type_mask.tolist(),
+            qualified_mask.tolist()
+        ),
+        "qualified_indices": qualified_indices,
+        "total_evaluated": len(table),
+        "passed": len(qualified_indices),
+        "failed": len(table) - len(qualified_indices)
+    }
 
-        # Determine if content qualifies
-        filters = [genre_check, rating_check, language_check, type_check]
-        qualified = all(f["passed"] for f in filters)
 
-        # Build evaluation record
-        evaluation = {
-            "item_id": content["content_id"],
+def _filter_kernel(
+    table: ContentTable,
+    genres: AbstractSet[str],
+    languages: AbstractSet[str],
+    types: AbstractSet[str],
+    min_rating: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Evaluate the filter predicates over whole columns.
+
+    Category filters are bit tests of the label code columns (see
+    ContentTable.in_codes). Returns the per-filter pass masks and their
+    conjunction, combined in place so only one array is allocated per output.
+    """
+    genre_ok = table.in_codes(table.genre_id, table.genre_codes, genres)
+    rating_ok = table.rating >= min_rating
+    language_ok = table.in_codes(table.language_id, table.language_codes, languages)
+    type_ok = table.in_codes(table.type_id, table.type_codes, types)
+
+    qualified = genre_ok.copy()
+    qualified &= rating_ok
+    qualified &= language_ok
+    qualified &= type_ok
+    return genre_ok, rating_ok, language_ok, type_ok, qualified
+
+
+def _iter_evaluations(
+    table: ContentTable,
+    criteria: Dict[str, Any],
+    accepted_languages: AbstractSet[str],
+    genre_ok: List[bool],
+    rating_ok: List[bool],
+    language_ok: List[bool],
+    type_ok: List[bool],
+    qualified: List[bool]
+) -> Iterator[Dict[str, Any]]:
+    """Yield an evaluation record per item from precomputed filter outcomes."""
+    # Genre, language and type details depend only on the label (so does
+    # the outcome), so each is formatted once per distinct label. Preference
+    # sets are shown sorted, so details don't depend on set order.
+    preferred_genres = criteria["preferred_genres"]
+    genre_preferences = f"preferences {sorted(preferred_genres)}"
+    genre_details = {
+        genre: f"Genre '{genre}' {'matches' if genre in preferred_genres else 'does not match'} {genre_preferences}"
+        for genre in table.genre_codes
+    }
+    language_details = {
+        language: f"Language '{language}' {'is supported' if language in accepted_languages else 'not supported'}"
+        for language in table.language_codes
+    }
+    preferred_types = criteria["preferred_content_types"]
+    type_preferences = f"preferences {sorted(preferred_types)}"
+    type_details = {
+        content_type: f"Type '{content_type}' {'matches' if content_type in preferred_types else 'does not match'} {type_preferences}"
+        for content_type in table.type_codes
+    }
+    # Rating details only vary in the rating; the rest is indexed by outcome
+    threshold = criteria["minimum_rating_threshold"]
+    rating_suffixes = (f" < {threshold} threshold", f" >= {threshold} threshold")
+
+    rows = zip(
+        table.content_id.tolist(),
+        table.title.tolist(),
+        table.genre.tolist(),
+        table.type.tolist(),
+        table.rating.tolist(),
+        table.language.tolist(),
+        table.views.tolist()
+    )
+    outcomes = zip(genre_ok, rating_ok, language_ok, type_ok, qualified)
+
+    for (content_id, title, genre, content_type, rating, language, views), (
+        genre_match, rating_match, language_match, type_match, is_qualified
+    ) in zip(rows, outcomes):
+        filters = [
+            {
+                "name": "genre_match",
+                "passed": genre_match,
+                "detail": genre_details[genre]
+            },
+            {
+                "name": "minimum_rating",
+                "passed": rating_match,
+                "detail": f"{rating}{rating_suffixes[rating_match]}"
+            },
+            {
+                "name": "language_support",
+                "passed": language_match,
+                "detail": language_details[language]
+            },
+            {
+                "name": "content_type",
+                "passed": type_match,
+                "detail": type_details[content_type]
+            }
+        ]
+
+        yield {
+            "item_id": content_id,
             "item_data": {
-                "title": content["title"],
-                "genre": content["genre"],
-                "type": content["type"],
-                "rating": content["rating"],
-                "language": content["language"],
-                "views": content["views"]
+                "title": title,
+                "genre": genre,
+                "type": content_type,
+                "rating": rating,
+                "language": language,
+                "views": views
             },
             "filters": filters,
-            "qualified": qualified,
-            "reasoning": "Passed all filters" if qualified else f"Failed: {', '.join(f['name'] for f in filters if not f['passed'])}"
+            "qualified": is_qualified,
+            "reasoning": "Passed all filters" if is_qualified else _failure_reasoning(
+                genre_match, rating_match, language_match, type_match
+            )
         }
 
-        evaluations.append(evaluation)
-
-        if qualified:
-            qualified_content.append(content)
 
-    return {
-        "evaluations": evaluations,
-        "qualified_content": qualified_content,
-        "total_evaluated": len(content_pool),
-        "passed": len(qualified_content),
-        "failed": len(content_pool) - len(qualified_content)
-    }
+def _failure_reasoning(genre_ok: bool, rating_ok: bool, language_ok: bool, type_ok: bool) -> str:
+    """Name the failed filters straight from their outcomes."""
+    failed = []
+    if not genre_ok:
+        failed.append("genre_match")
+    if not rating_ok:
+        failed.append("minimum_rating")
+    if not language_ok:
+        failed.append("language_support")
+    if not type_ok:
+        failed.append("content_type")
+    return f"Failed: {', '.join(failed)}"
@@ -6,6 +6,14 @@ Analyzes user preferences and watch history to extract recommendation criteria.
 
 from typing import Dict, Any, List
 
+# Runtime in minutes of known watch-history titles
+_RUNTIME_BY_TITLE = {
+    "Inception": 169,
+    "The Social Network": 120,
+}
+# Assumed runtime of any other title (a typical episode)
+_DEFAULT_RUNTIME = 50
+
 
 def analyze_user_profile(user_profile: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -31,19 +39,18 @@ def analyze_user_profile(user_profile: Dict[str, Any]) -> Dict[str, Any]:
         content_type_counts[pref_type] = 1
 
     # Determine if user likes long-form content
-    avg_watch_time = sum([
-        169 if item["title"] == "Inception" else
-        120 if item["title"] == "The Social Network" else
-        50
+    avg_watch_time = sum(
+        _RUNTIME_BY_TITLE.get(item["title"], _DEFAULT_RUNTIME)
         for item in user_profile["watch_history"]
-    ]) / len(user_profile["watch_history"])
+    ) / len(user_profile["watch_history"])
 
     prefers_long_form = avg_watch_time > 90
 
+    # Preference fields are frozensets so filters test membership by hash
     return {
-        "preferred_genres": list(preferred_genres),
-        "preferred_languages": user_profile["preferences"]["languages"],
-        "preferred_content_types": user_profile["preferences"]["content_types"],
+        "preferred_genres": frozenset(preferred_genres),
+        "preferred_languages": frozenset(user_profile["preferences"]["languages"]),
+        "preferred_content_types": frozenset(user_profile["preferences"]["content_types"]),
         "minimum_rating_threshold": user_profile["average_rating"] - 0.5,  # 4.25
         "prefers_long_form": prefers_long_form,
         "engagement_level": "high" if user_profile["average_rating"] >= 4.5 else "medium"
@@ -4,11 +4,16 @@ Content ranking and diversity scoring.
 Ranks qualified content and ensures diversity in recommendations.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any
+
+import numpy as np
+
+from demo2.data.content import ContentTable
 
 
 def rank_and_diversify(
-    qualified_content: List[Dict[str, Any]],
+    table: ContentTable,
+    qualified_indices: np.ndarray,
     user_profile: Dict[str, Any],
     top_n: int = 5
 ) -> Dict[str, Any]:
@@ -23,14 +28,15 @@ def rank_and_diversify(
     Diversity: Ensure varied genres in top recommendations
 
     Args:
-        qualified_content: List of content that passed filters
+        table: Column view of the available content
+        qualified_indices: Rows of the table that passed filters
         user_profile: User profile for personalization
         top_n: Number of recommendations to return
 
     Returns:
         Dict with ranked content and diversity analysis
     """
-    if not qualified_content:
+    if len(qualified_indices) == 0:
         return {
             "ranked_content": [],
             "recommendations": [],
@@ -38,96 +44,116 @@ def rank_and_diversify(
             "reason": "No qualified content available"
         }
 
-    # Calculate scores for each content
-    scored_content = []
-    for content in qualified_content:
-        # Relevance score (0-1)
-        # Check if genre is in user's top preferences
-        genre_relevance = 1.0 if content["genre"] in user_profile["preferences"]["genres"] else 0.7
-
-        # Normalize rating (assuming max rating is 5)
-        rating_score = content["rating"] / 5.0
-
-        # Combine for relevance
-        relevance_score = (genre_relevance * 0.6 + rating_score * 0.4)
-
-        # Popularity score (already normalized 0-1)
-        popularity_score = content["popularity_score"]
-
-        # Recency score (newer is better)
-        current_year = 2024
-        years_old = current_year - content["release_year"]
-        recency_score = max(0, 1 - (years_old / 20))  # Decay over 20 years
-
-        # Weighted total score
-        total_score = (
-            relevance_score * 0.5 +      # 50% weight
-            popularity_score * 0.3 +     # 30% weight
-            recency_score * 0.2          # 20% weight
-        )
-
-        scored_content.append({
-            "content": content,
-            "scores": {
-                "relevance_score": round(relevance_score, 2),
-                "popularity_score": round(popularity_score, 2),
-                "recency_score": round(recency_score, 2),
-                "total_score": round(total_score, 2)
-            }
-        })
-
-    # Sort by total score (highest first)
-    scored_content.sort(key=lambda x: x["scores"]["total_score"], reverse=True)
+    # Score all qualified content at once from its numeric columns
+    qualified_indices = np.asarray(qualified_indices, dtype=np.intp)
+    genre_ids = table.genre_id[qualified_indices]
+
+    # Relevance score (0-1)
+    # Check if genre is in user's top preferences
+    is_top_genre = table.in_codes(genre_ids, table.genre_codes, user_profile["preferences"]["genres"])
+    genre_relevance = np.where(is_top_genre, 1.0, 0.7)
+
+    # Normalized rating (precomputed per content)
+    rating_score = table.rating_score[qualified_indices]
+
+    # Combine for relevance
+    relevance_score = genre_relevance * 0.6 + rating_score * 0.4
+
+    # Popularity score (already normalized 0-1)
+    popularity_score = table.popularity_score[qualified_indices]
+
+    # Recency score (newer is better; precomputed per content)
+    recency_score = table.recency_score[qualified_indices]
+
+    # Weighted total score
+    total_score = (
+        relevance_score * 0.5 +      # 50% weight
+        popularity_score * 0.3 +     # 30% weight
+        recency_score * 0.2          # 20% weight
+    )
+
+    # Content is ordered by its rounded total score. The other scores are
+    # only rounded for the entries that are emitted. (Python's round is kept:
+    # np.round scales by 100 first, which moves near-half values like 0.785.)
+    total_rounded = np.array([round(total, 2) for total in total_score.tolist()])
+
+    # Only the top top_n * 2 are displayed, and the fill pass never looks
+    # past them, so select those without sorting every candidate. The genre
+    # pass walks the whole ranking though: the shortlist is enough only if it
+    # already yields top_n genres or holds every qualified genre.
+    order = _top_order(total_rounded, top_n * 2)
+    if len(order) < len(total_rounded):
+        shortlist_genres = len(np.unique(genre_ids[order]))
+        if shortlist_genres < min(top_n, len(np.unique(genre_ids))):
+            order = np.argsort(-total_rounded, kind="stable")
+
+    # Positions into the qualified rows, sorted by total score (highest
+    # first). Output dicts are only built for the entries that are emitted.
+    ranked_positions = order.tolist()
+    content_rows = qualified_indices.tolist()
+    relevance_values = relevance_score.tolist()
+    popularity_values = popularity_score.tolist()
+    recency_values = recency_score.tolist()
+    total_values = total_rounded.tolist()
 
     # Apply diversity: ensure genre variety in top N
-    diverse_recommendations = []
-    seen_genres = set()
+    diverse_positions = []
+    # One flag byte per genre code
+    seen_genres = bytearray(len(table.genre_codes))
     remaining_slots = top_n
 
-    # First pass: one from each genre
-    for sc in scored_content:
-        if remaining_slots == 0:
+    # Build ranked list alongside
+    ranked_content = []
+    display_count = top_n * 2  # Show more in rankings
+
+    # First pass: one from each genre, walking the ranking once for both
+    ranked_genre_ids = genre_ids[order].tolist()
+    for idx, (j, genre_id) in enumerate(zip(ranked_positions, ranked_genre_ids), start=1):
+        if remaining_slots == 0 and idx > display_count:
             break
-        genre = sc["content"]["genre"]
-        if genre not in seen_genres:
-            diverse_recommendations.append(sc)
-            seen_genres.add(genre)
+        if remaining_slots and not seen_genres[genre_id]:
+            diverse_positions.append(j)
+            seen_genres[genre_id] = 1
             remaining_slots -= 1
 
+        if idx <= display_count:
+            content = table.content[content_rows[j]]
+            ranked_content.append({
+                "rank": idx,
+                "content_id": content["content_id"],
+                "title": content["title"],
+                "type": content["type"],
+                "genre": content["genre"],
+                "metrics": {
+                    "rating": content["rating"],
+                    "views": content["views"],
+                    "release_year": content["release_year"]
+                },
+                "score_breakdown": {
+                    "relevance_score": round(relevance_values[j], 2),
+                    "popularity_score": round(popularity_values[j], 2),
+                    "recency_score": round(recency_values[j], 2),
+                    "total_score": total_values[j]
+                }
+            })
+
     # Second pass: fill remaining slots with highest scoring
-    for sc in scored_content:
+    selected = set(diverse_positions)
+    for j in ranked_positions:
         if remaining_slots == 0:
             break
-        if sc not in diverse_recommendations:
-            diverse_recommendations.append(sc)
+        if j not in selected:
+            diverse_positions.append(j)
             remaining_slots -= 1
 
-    # Build ranked list
-    ranked_content = []
-    for idx, sc in enumerate(scored_content[:top_n * 2], start=1):  # Show more in rankings
-        content = sc["content"]
-        ranked_content.append({
-            "rank": idx,
-            "content_id": content["content_id"],
-            "title": content["title"],
-            "type": content["type"],
-            "genre": content["genre"],
-            "metrics": {
-                "rating": content["rating"],
-                "views": content["views"],
-                "release_year": content["release_year"]
-            },
-            "score_breakdown": sc["scores"]
-        })
-
     # Calculate diversity score
-    unique_genres = len(set(rec["content"]["genre"] for rec in diverse_recommendations))
-    diversity_score = unique_genres / min(top_n, len(diverse_recommendations)) if diverse_recommendations else 0
+    unique_genres = len(set(genre_ids[diverse_positions].tolist()))
+    diversity_score = unique_genres / min(top_n, len(diverse_positions)) if diverse_positions else 0
 
     # Build final recommendations
     recommendations = []
-    for idx, rec in enumerate(diverse_recommendations, start=1):
-        content = rec["content"]
+    for idx, j in enumerate(diverse_positions, start=1):
+        content = table.content[content_rows[j]]
         recommendations.append({
             "position": idx,
             "content_id": content["content_id"],
@@ -135,8 +161,8 @@ def rank_and_diversify(
             "type": content["type"],
             "genre": content["genre"],
             "rating": content["rating"],
-            "score": rec["scores"]["total_score"],
-            "reason": f"High relevance ({rec['scores']['relevance_score']}) and popularity ({rec['scores']['popularity_score']})"
+            "score": total_values[j],
+            "reason": f"High relevance ({round(relevance_values[j], 2)}) and popularity ({round(popularity_values[j], 2)})"
         })
 
     return {
@@ -144,5 +170,26 @@ def rank_and_diversify(
         "recommendations": recommendations,
         "diversity_score": round(diversity_score, 2),
         "unique_genres": unique_genres,
-        "total_candidates": len(qualified_content)
+        "total_candidates": len(qualified_indices)
     }
+
+
+def _top_order(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k highest scores, highest first.
+
+    Selects with a partition instead of a full sort. Ties keep position
+    order, at the cutoff too, so the result matches the head of a stable
+    descending sort.
+    """
+    n = len(scores)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        kth = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > kth)
+        tied = np.flatnonzero(scores == kth)[:k - len(above)]
+        candidates = np.union1d(above, tied)
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
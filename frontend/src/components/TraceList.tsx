@@ -263,7 +263,7 @@ function TraceList() {
                   <td className="px-6 py-4 whitespace-nowrap">
                     <div className="flex items-center">
                       <span className="text-sm font-semibold text-gray-900 mr-1">
-                        {trace.steps.length}
+                        {trace.step_count ?? trace.steps.length}
                       </span>
                       <span className="text-xs text-gray-500">steps</span>
                     </div>
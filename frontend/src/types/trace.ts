@@ -27,6 +27,7 @@ export interface Trace {
   end_time?: string;
   duration_ms?: number;
   steps: Step[];
+  step_count?: number;  // Set on list summaries, which omit steps
   metadata: Record<string, any>;
   status: 'running' | 'completed' | 'failed';
 }